@@ -1,15 +1,12 @@
 # app.py
-from dotenv import load_dotenv, find_dotenv
-load_dotenv(find_dotenv(), override=True)
-
 from pathlib import Path
 import streamlit as st
 
-from assembly_ai import upload_file, transcribe, save_srt
-from burn import burn_subtitles
-
 import os, re
-import deepl
+
+# deepl, assembly_ai (requests) y burn se importan recién al usarlos:
+# el script se re-ejecuta en cada interacción y la UI tiene que pintarse
+# sin pagar esos imports ni ninguna llamada de red.
 
 
 # =========================
@@ -59,12 +56,31 @@ def _init_srts():
     st.session_state.setdefault("active_lang", None)
 
 
+# =========================
+# Configuración y clientes (una vez por proceso)
+# =========================
+@st.cache_resource(show_spinner=False)
+def _load_config() -> list[str]:
+    """Carga el .env y devuelve las claves que faltan. Corre una sola vez por proceso."""
+    from dotenv import load_dotenv, find_dotenv
+    load_dotenv(find_dotenv(), override=True)
+    return [k for k in ("ASSEMBLYAI_KEY", "DEEPL_API_KEY") if not os.getenv(k)]
+
+
+@st.cache_resource(show_spinner=False)
+def _deepl_translator(key: str):
+    """Cliente DeepL creado en el primer uso y compartido entre reruns."""
+    import deepl
+    return deepl.Translator(key)
+
+
 
 # =========================
 # Configuración básica
 # =========================
 st.set_page_config(page_title="Caption MVP", page_icon="🎬", layout="centered")
 _init_srts()
+missing_keys = _load_config()
 
 # Limitar el ancho del <video> y centrarlo
 st.markdown("""
@@ -109,10 +125,13 @@ lang_dst = st.sidebar.selectbox(
     index=0
 )
 
+if missing_keys:
+    st.sidebar.warning(f"Faltan variables de entorno: {', '.join(missing_keys)}")
+
 show_debug = st.sidebar.checkbox("Mostrar logs de depuración", value=False)
 if show_debug:
     try:
-        tr = deepl.Translator(os.getenv("DEEPL_API_KEY"))
+        tr = _deepl_translator(os.getenv("DEEPL_API_KEY"))
         prueba = tr.translate_text("Hola, esto es una prueba.", source_lang="ES", target_lang="EN-US").text
         st.write("Test DeepL ES→EN-US:", prueba)
     except Exception as e:
@@ -129,10 +148,13 @@ uploaded = st.file_uploader("Subí un archivo de video (.mp4)", type=["mp4"])
 video_local_path = None
 
 if uploaded:
-    # Guardar el video subido en disco para procesarlo
+    # Guardar el video subido en disco para procesarlo (solo una vez por subida:
+    # reescribirlo en cada rerun invalidaría la caché del quemado incremental)
     video_local_path = WORKDIR / uploaded.name
-    with open(video_local_path, "wb") as f:
-        f.write(uploaded.getbuffer())
+    if st.session_state.get("uploaded_id") != uploaded.file_id or not video_local_path.exists():
+        with open(video_local_path, "wb") as f:
+            f.write(uploaded.getbuffer())
+        st.session_state["uploaded_id"] = uploaded.file_id
 
     # Vista previa centrada y con ancho controlado
     col1, col2, col3 = st.columns([1, 2, 1])
@@ -156,6 +178,8 @@ if st.button("📝 Generar subtítulos (SRT)", disabled=not bool(video_local_pat
         st.error("Primero subí un MP4.")
         st.stop()
 
+    from assembly_ai import upload_file, transcribe, save_srt
+
     with st.spinner("Subiendo a AssemblyAI..."):
         try:
             audio_url = upload_file(str(video_local_path))
@@ -237,7 +261,7 @@ def _translate_srt_file(input_srt: Path, src="auto", tgt="en") -> Path:
     if not key:
         raise RuntimeError("Falta DEEPL_API_KEY en el entorno.")
 
-    translator = deepl.Translator(key)
+    translator = _deepl_translator(key)
 
     # DeepL acepta 'None' como autodetección para source.
     def _dl_src(code: str | None):
@@ -416,6 +440,7 @@ if "last_video_path" in st.session_state and "last_srt_path" in st.session_state
     if st.button("🔥 Generar MP4 con subtítulos (usar activo)"):
         with st.spinner("Ejecutando FFmpeg..."):
             try:
+                from burn import burn_subtitles
                 burn_subtitles(
                     input_mp4=str(vid_path),
                     srt_path=str(srt_active),
@@ -491,7 +516,7 @@ if st.button("🧹 Limpiar archivos temporales"):
              else __import__("shutil").rmtree(p, ignore_errors=True))
 
         # limpiar estado
-        for k in ("srts", "active_lang", "last_srt_path", "last_video_path"):
+        for k in ("srts", "active_lang", "last_srt_path", "last_video_path", "uploaded_id"):
             st.session_state.pop(k, None)
 
         st.success("Se limpió la carpeta temporal.")
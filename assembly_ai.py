@@ -1,18 +1,26 @@
 # assembly_ai.py
 import os
 import time
+from functools import lru_cache
 import requests
 from dotenv import load_dotenv
 
-# Carga variables de entorno (.env con ASSEMBLYAI_KEY=...)
-load_dotenv()
-API_KEY = os.getenv("ASSEMBLYAI_KEY")
-if not API_KEY:
-    raise RuntimeError("Falta ASSEMBLYAI_KEY en .env")
-
 UPLOAD_URL = "https://api.assemblyai.com/v2/upload"
 TRANSCRIBE_URL = "https://api.assemblyai.com/v2/transcript"
-HEADERS = {"authorization": API_KEY}
+
+
+@lru_cache(maxsize=1)
+def _headers() -> dict:
+    """
+    Headers de autenticación, armados en el primer uso.
+    La clave se valida acá (no al importar) para no frenar el arranque de la app.
+    """
+    # Carga variables de entorno (.env con ASSEMBLYAI_KEY=...)
+    load_dotenv()
+    api_key = os.getenv("ASSEMBLYAI_KEY")
+    if not api_key:
+        raise RuntimeError("Falta ASSEMBLYAI_KEY en .env")
+    return {"authorization": api_key}
 
 def upload_file(path: str) -> str:
     """
@@ -26,7 +34,7 @@ def upload_file(path: str) -> str:
                     break
                 yield data
 
-    r = requests.post(UPLOAD_URL, headers=HEADERS, data=_read_file(path))
+    r = requests.post(UPLOAD_URL, headers=_headers(), data=_read_file(path))
     r.raise_for_status()
     return r.json()["upload_url"]
 
@@ -39,13 +47,13 @@ def transcribe(audio_url: str, lang_hint: str | None = None, poll_secs: int = 3)
     if lang_hint in {"es", "en"}:
         payload["language_code"] = lang_hint  # pista de idioma (opcional)
 
-    r = requests.post(TRANSCRIBE_URL, headers=HEADERS, json=payload)
+    r = requests.post(TRANSCRIBE_URL, headers=_headers(), json=payload)
     r.raise_for_status()
     tid = r.json()["id"]
 
     # Polling hasta que finalice
     while True:
-        j = requests.get(f"{TRANSCRIBE_URL}/{tid}", headers=HEADERS)
+        j = requests.get(f"{TRANSCRIBE_URL}/{tid}", headers=_headers())
         j.raise_for_status()
         data = j.json()
         status = data.get("status")
@@ -58,7 +66,7 @@ def save_srt(transcript_id: str, out_path: str = "subtitulos.srt") -> str:
     """
     Descarga el SRT final para una transcripción completada y lo guarda en disco.
     """
-    srt_resp = requests.get(f"{TRANSCRIBE_URL}/{transcript_id}/srt", headers=HEADERS)
+    srt_resp = requests.get(f"{TRANSCRIBE_URL}/{transcript_id}/srt", headers=_headers())
     srt_resp.raise_for_status()
     with open(out_path, "w", encoding="utf-8") as f:
         f.write(srt_resp.text)
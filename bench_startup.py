@@ -0,0 +1,104 @@
+# bench_startup.py
+"""
+Benchmark de arranque: tiempo de imports y del primer render de app.py.
+
+Levanta un proceso nuevo con `python -X importtime`, renderiza app.py una vez
+con el AppTest de Streamlit (sin navegador ni servidor) y reporta:
+  - el tiempo total del primer render,
+  - los imports más caros (acumulado, estilo -X importtime),
+  - si se importaron módulos pesados que deberían cargarse recién al usarlos.
+
+Uso:
+    python bench_startup.py [--top 15] [--runs 3]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Módulos que NO deberían cargarse en el primer render (requests no se lista:
+# streamlit ya lo importa por su cuenta)
+LAZY_MODULES = ("deepl", "assembly_ai", "burn")
+
+_CHILD = """
+import json, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file("app.py", default_timeout=60)
+at.run()
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_s": t1 - t0,
+    "render_s": t2 - t1,
+    "exceptions": [str(e.value) for e in at.exception],
+}))
+"""
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """Devuelve (módulo, self_us, cumulative_us) para cada línea de -X importtime."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.rstrip(), int(self_us), int(cum_us)))
+    return rows
+
+
+def _positive_int(value: str) -> int:
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError("tiene que ser >= 1")
+    return n
+
+
+def run_once(app_dir: Path) -> tuple[dict, list[tuple[str, int, int]]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD],
+        cwd=app_dir, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"El benchmark falló:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result, _parse_importtime(proc.stderr)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--top", type=int, default=15, help="imports más caros a listar")
+    ap.add_argument("--runs", type=_positive_int, default=3, help="procesos en frío a medir (>= 1)")
+    args = ap.parse_args()
+
+    app_dir = Path(__file__).resolve().parent
+    renders = []
+    for _ in range(args.runs):
+        result, rows = run_once(app_dir)
+        renders.append(result["render_s"])
+
+    # Reporte del último proceso (imports) + mediana de los renders
+    renders.sort()
+    print(f"Primer render app.py: mediana {renders[len(renders) // 2] * 1000:.0f} ms "
+          f"(min {renders[0] * 1000:.0f} ms, {args.runs} procesos)")
+    print(f"Import de streamlit.testing: {result['import_s'] * 1000:.0f} ms")
+    for exc in result["exceptions"]:
+        print(f"  ! excepción en el render: {exc}")
+
+    top_level = [r for r in rows if len(r[0]) - len(r[0].lstrip()) == 1]
+    total_us = sum(r[2] for r in top_level)
+    print(f"\nImports totales: {total_us / 1000:.0f} ms · top {args.top} (acumulado):")
+    print(f"{'cumulative [ms]':>16} | {'self [ms]':>9} | módulo")
+    for name, self_us, cum_us in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"{cum_us / 1000:16.1f} | {self_us / 1000:9.1f} | {name}")
+
+    loaded = {name.strip() for name, _, _ in rows}
+    eager = [m for m in LAZY_MODULES if m in loaded]
+    print("\nMódulos diferidos cargados en el primer render:", ", ".join(eager) or "ninguno")
+    if eager:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
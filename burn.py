@@ -1,36 +1,359 @@
 # burn.py
+import json
 import os
+import re
+import shutil
 import subprocess
 from pathlib import Path
 
 # Lee la ruta del binario de ffmpeg desde .env o usa 'ffmpeg' si ya está en PATH
 FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
+# ffprobe se busca al lado de ffmpeg salvo que se defina FFPROBE_BIN
+_ffmpeg = Path(FFMPEG_BIN)
+FFPROBE_BIN = os.getenv("FFPROBE_BIN", str(_ffmpeg.with_name(_ffmpeg.name.replace("ffmpeg", "ffprobe"))))
+
+# Escalar a máx. 720 px de ancho (cambiá el tope si querés)
+MAX_W = 720
+# Duración (s) de cada segmento cacheado para el re-quemado incremental
+SEGMENT_SECS = 10
+# Parámetros de codificación compartidos por la pasada completa y los segmentos.
+# passthrough: un frame de salida por frame de entrada (sin dup/drop), así un
+# segmento re-codificado tiene exactamente los mismos frames que la pasada completa.
+# -vsync (y no -fps_mode, que recién existe desde FFmpeg 5.1) para seguir
+# funcionando con FFmpeg 4.x.
+ENCODE_ARGS = ["-vsync", "passthrough", "-c:v", "libx264", "-crf", "20", "-preset", "veryfast"]
+# Margen para que los cortes (keyframe forzado, segmenter, -ss) no se salteen
+# el primer frame de un segmento por redondeo de timestamps
+_CUT_EPS = 0.001
+
+# Misma tolerancia que el parser de SRT de ffmpeg: H:MM:SS[,.]mmm
+_TIME_PAT = re.compile(
+    r"(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})\s*-->\s*(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})"
+)
+
+
+def _run(cmd: list[str]) -> None:
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"FFmpeg falló:\nSTDOUT:\n{proc.stdout}\nSTDERR:\n{proc.stderr}")
+
+
+def _build_vf(srt: Path, fontsize: int) -> str:
+    # En Windows, al filtro subtitles le gustan las rutas con / y el : escapado
+    srt_esc = str(srt).replace("\\", "/").replace(":", r"\:")
+    if fontsize:
+        return (
+            f"scale='min({MAX_W},iw)':-2,"
+            f"subtitles='{srt_esc}':force_style='Fontsize={fontsize},Outline=1,Shadow=1'"
+        )
+    return f"scale='min({MAX_W},iw)':-2,subtitles='{srt_esc}'"
+
+
+# =========================
+# SRT -> cues (en milisegundos)
+# =========================
+def _parse_srt(srt: Path) -> list[list] | None:
+    """
+    Devuelve los cues del .srt como [inicio_ms, fin_ms, texto].
+    Si no se pudo leer cada línea de tiempos como un cue propio, devuelve None:
+    en ese caso no se puede confiar en el diff y hay que quemar todo.
+    """
+    with srt.open("r", encoding="utf-8", errors="ignore") as f:
+        text = f.read()
+
+    # Bloques separados por líneas vacías o con solo espacios
+    blocks, block = [], []
+    for line in text.splitlines():
+        if line.strip():
+            block.append(line.strip())
+        elif block:
+            blocks.append(block)
+            block = []
+    if block:
+        blocks.append(block)
+
+    cues = []
+    for lines in blocks:
+        for i, line in enumerate(lines):
+            m = _TIME_PAT.match(line)
+            if not m:
+                continue
+            h1, m1, s1, ms1, h2, m2, s2, ms2 = map(int, m.groups())
+            start = ((h1 * 60 + m1) * 60 + s1) * 1000 + ms1
+            end = ((h2 * 60 + m2) * 60 + s2) * 1000 + ms2
+            cues.append([start, end, "\n".join(lines[i + 1:])])
+            break
+
+    timing_lines = sum(1 for ln in text.splitlines() if _TIME_PAT.search(ln))
+    return cues if len(cues) == timing_lines else None
+
+
+def _segment_cues(cues: list[list], start: float, end: float | None) -> list[list]:
+    """
+    Cues que se solapan con [start, end) (segundos; end=None hasta el final).
+    Es la "firma" del segmento: si no cambia, el render cacheado sigue valiendo.
+    """
+    start_ms = start * 1000
+    end_ms = None if end is None else end * 1000
+    return [
+        c for c in cues
+        if c[1] > start_ms and (end_ms is None or c[0] < end_ms)
+    ]
+
+
+def _sign(segments: list[dict], cues: list[list]) -> None:
+    for i, seg in enumerate(segments):
+        end = segments[i + 1]["start"] if i + 1 < len(segments) else None
+        seg["cues"] = _segment_cues(cues, seg["start"], end)
+
+
+# =========================
+# Caché de segmentos
+# =========================
+def _cache_key(in_mp4: Path, fontsize: int) -> dict:
+    st = in_mp4.stat()
+    return {
+        "input": str(in_mp4),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "fontsize": fontsize,
+        "max_w": MAX_W,
+        "segment_secs": SEGMENT_SECS,
+        "encode": ENCODE_ARGS,
+    }
+
+
+def _load_manifest(seg_dir: Path, key: dict) -> list[dict] | None:
+    """Segmentos del quemado anterior (cortes reales + firmas), o None si no sirven."""
+    try:
+        data = json.loads((seg_dir / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("key") != key:
+        return None
+    segments = data.get("segments") or []
+    if not all((seg_dir / _seg_name(i)).exists() for i in range(len(segments))):
+        return None
+    return segments or None
+
+
+def _seg_name(idx: int) -> str:
+    return f"seg_{idx:05d}.mp4"
+
+
+class _ProbeError(RuntimeError):
+    """ffprobe no está disponible o no devolvió algo utilizable."""
+
+
+def _probe(cmd: list[str]) -> str:
+    try:
+        proc = subprocess.run([FFPROBE_BIN, "-v", "error", *cmd], capture_output=True, text=True)
+    except OSError as e:
+        raise _ProbeError(f"No se pudo ejecutar ffprobe ({FFPROBE_BIN}): {e}") from e
+    if proc.returncode != 0:
+        raise _ProbeError(f"FFprobe falló:\nSTDOUT:\n{proc.stdout}\nSTDERR:\n{proc.stderr}")
+    return proc.stdout
+
+
+def _count_frames(mp4: Path) -> int:
+    out = _probe([
+        "-select_streams", "v:0", "-count_packets",
+        "-show_entries", "stream=nb_read_packets", "-of", "csv=p=0", str(mp4),
+    ])
+    try:
+        return int(out.split()[0].strip(","))
+    except (IndexError, ValueError) as e:
+        raise _ProbeError(f"Salida inesperada de ffprobe: {out!r}") from e
+
+
+def _frame_times(mp4: Path) -> list[float]:
+    """
+    Tiempos (s) de cada frame de video en orden de presentación, relativos al
+    inicio del archivo (la misma línea de tiempo que ve el filtro subtitles).
+    Solo lee los paquetes, no decodifica.
+    """
+    out = _probe([
+        "-select_streams", "v:0", "-show_entries", "packet=pts_time:format=start_time",
+        "-of", "json", str(mp4),
+    ])
+    try:
+        data = json.loads(out)
+        offset = float(data.get("format", {}).get("start_time") or 0)
+        return sorted(
+            float(p["pts_time"]) - offset
+            for p in data.get("packets", []) if p.get("pts_time") not in (None, "N/A")
+        )
+    except (ValueError, AttributeError) as e:
+        raise _ProbeError(f"Salida inesperada de ffprobe: {e}") from e
+
+
+def _plan_segments(times: list[float]) -> list[dict]:
+    """
+    Corta en el primer frame en o después de cada múltiplo de SEGMENT_SECS.
+    Con frame rate variable el corte real cae donde haya un frame, así que se
+    guarda su tiempo exacto y la cantidad de frames de cada segmento.
+    """
+    if not times:
+        return []
+    segments = []
+    first, next_cut = 0, SEGMENT_SECS
+    for idx, t in enumerate(times):
+        if t < next_cut:
+            continue
+        if idx > first:
+            segments.append({"start": times[first], "frames": idx - first})
+            first = idx
+        while next_cut <= t:
+            next_cut += SEGMENT_SECS
+    segments.append({"start": times[first], "frames": len(times) - first})
+    return segments
+
+
+def _full_pass(in_mp4: Path, srt: Path, seg_dir: Path, fontsize: int) -> list[dict] | None:
+    """
+    Codifica el video completo una sola vez, forzando un keyframe en el primer
+    frame de cada segmento planificado, y lo corta ahí por copia de stream
+    (solo video). Devuelve los segmentos, o None si los cortes del segmenter
+    no coinciden con el plan (el MP4 sale bien, pero no se cachea).
+    """
+    shutil.rmtree(seg_dir, ignore_errors=True)
+    seg_dir.mkdir(parents=True)
+    segments = _plan_segments(_frame_times(in_mp4))
+    cuts = ",".join(f"{seg['start'] - _CUT_EPS:.6f}" for seg in segments[1:])
+    cmd = [FFMPEG_BIN, "-y", "-i", str(in_mp4), "-vf", _build_vf(srt, fontsize), "-an", *ENCODE_ARGS]
+    if cuts:
+        cmd += ["-force_key_frames", cuts, "-segment_times", cuts]
+    else:
+        # Clip más corto que un segmento: un solo archivo
+        cmd += ["-segment_time", "1000000"]
+    cmd += ["-f", "segment", "-reset_timestamps", "1", str(seg_dir / "seg_%05d.mp4")]
+    _run(cmd)
+
+    if len(list(seg_dir.glob("seg_*.mp4"))) != len(segments):
+        return None
+    if any(_count_frames(seg_dir / _seg_name(i)) != seg["frames"] for i, seg in enumerate(segments)):
+        return None
+    return segments
+
+
+def _render_segment(in_mp4: Path, srt: Path, seg_dir: Path, idx: int,
+                    seg: dict, fontsize: int) -> bool:
+    """
+    Re-codifica solo el segmento idx: desde su primer frame real y con la misma
+    cantidad de frames que el cacheado. Quema el SRT completo con los tiempos
+    absolutos (-copyts), igual que la pasada completa.
+    Devuelve False si el resultado no coincide en frames con el cacheado.
+    """
+    tmp = seg_dir / f"seg_{idx:05d}.tmp.mp4"
+    cmd = [
+        FFMPEG_BIN, "-y", "-copyts", "-start_at_zero",
+        "-ss", f"{max(seg['start'] - _CUT_EPS, 0):.6f}", "-i", str(in_mp4),
+        "-vf", _build_vf(srt, fontsize) + ",setpts=PTS-STARTPTS", "-an",
+        *ENCODE_ARGS, "-frames:v", str(seg["frames"]), str(tmp),
+    ]
+    _run(cmd)
+    if _count_frames(tmp) != seg["frames"]:
+        tmp.unlink(missing_ok=True)
+        return False
+    os.replace(tmp, seg_dir / _seg_name(idx))
+    return True
+
+
+def _concat(in_mp4: Path, seg_dir: Path, count: int, out_mp4: Path,
+            starts: list[float] | None = None) -> None:
+    """
+    Une los segmentos por copia de stream y agrega el audio original.
+    Con starts, la duración de cada segmento se fija a su corte real para que
+    un segmento re-codificado no corra a los siguientes respecto del audio.
+    """
+    lines = []
+    for i in range(count):
+        lines.append(f"file '{_seg_name(i)}'\n")
+        if starts and i < count - 1:
+            lines.append(f"duration {starts[i + 1] - starts[i]:.6f}\n")
+    list_file = seg_dir / "concat.txt"
+    list_file.write_text("".join(lines), encoding="utf-8")
+    cmd = [
+        FFMPEG_BIN, "-y", "-f", "concat", "-safe", "0", "-i", str(list_file),
+        "-i", str(in_mp4), "-map", "0:v", "-map", "1:a:0?", "-c", "copy", str(out_mp4),
+    ]
+    _run(cmd)
+
+
+def _reburn_dirty(in_mp4: Path, srt: Path, seg_dir: Path, previous: list[dict],
+                  cues: list[list], fontsize: int) -> list[dict] | None:
+    """
+    Re-codifica solo los segmentos cuyos cues cambiaron.
+    Devuelve los segmentos actualizados, o None si conviene una pasada completa.
+    """
+    segments = [{"start": s["start"], "frames": s["frames"]} for s in previous]
+    _sign(segments, cues)
+    dirty = [i for i, seg in enumerate(segments) if seg["cues"] != previous[i]["cues"]]
+    if len(dirty) == len(segments):
+        return None
+    for i in dirty:
+        if not _render_segment(in_mp4, srt, seg_dir, i, segments[i], fontsize):
+            return None
+    return segments
+
+
+def _burn_segmented(in_mp4: Path, srt: Path, out_mp4: Path, seg_dir: Path, key: dict,
+                    cues: list[list] | None, previous: list[dict] | None, fontsize: int) -> None:
+    """Quemado por segmentos: re-usa los cacheados o hace la pasada completa."""
+    segments = None
+    if previous:
+        segments = _reburn_dirty(in_mp4, srt, seg_dir, previous, cues, fontsize)
+    if segments is None:
+        # Sin caché útil (o cambió todo): una sola pasada completa
+        segments = _full_pass(in_mp4, srt, seg_dir, fontsize)
+        if segments is None:
+            # El segmenter cortó distinto de lo planificado: unir lo que haya
+            _concat(in_mp4, seg_dir, len(list(seg_dir.glob("seg_*.mp4"))), out_mp4)
+            return
+        if cues is not None:
+            _sign(segments, cues)
+
+    _concat(in_mp4, seg_dir, len(segments), out_mp4, [seg["start"] for seg in segments])
+    if cues is not None:
+        (seg_dir / "manifest.json").write_text(
+            json.dumps({"key": key, "segments": segments}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+
+def _single_pass(in_mp4: Path, srt: Path, out_mp4: Path, fontsize: int) -> None:
+    """Quemado clásico en una sola pasada, sin segmentos ni caché."""
+    cmd = [
+        FFMPEG_BIN, "-y", "-i", str(in_mp4), "-vf", _build_vf(srt, fontsize),
+        "-c:v", "libx264", "-crf", "20", "-preset", "veryfast", "-c:a", "copy", str(out_mp4),
+    ]
+    _run(cmd)
+
 
 def burn_subtitles(input_mp4: str, srt_path: str, output_mp4: str, fontsize: int = 16) -> None:
     """
     Quema el archivo .srt dentro del MP4 usando FFmpeg.
     Requiere que ffmpeg esté instalado. Si no está en PATH, definir FFMPEG_BIN en .env.
+
+    El video quemado se guarda también en segmentos de ~SEGMENT_SECS segundos
+    (carpeta <salida>.segments/). Si se vuelve a quemar el mismo video con un
+    SRT editado, solo se re-codifican los segmentos cuyos cues cambiaron y el
+    resto se une por copia de stream. La caché es solo una optimización: si
+    ffprobe no está disponible, se quema en una sola pasada como siempre.
     """
     in_mp4 = Path(input_mp4).resolve()
     srt = Path(srt_path).resolve()
     out_mp4 = Path(output_mp4).resolve()
+    seg_dir = out_mp4.with_suffix(".segments")
 
-    # En Windows, al filtro subtitles le gustan las rutas con / y el : escapado
-    srt_esc = str(srt).replace("\\", "/").replace(":", r"\:")
-
-    # Escalar a máx. 720 px de ancho y luego quemar subtítulos
-    max_w = 720  # cambiá el tope si querés
-    if fontsize:
-        vf = (
-            f"scale='min({max_w},iw)':-2,"
-            f"subtitles='{srt_esc}':force_style='Fontsize={fontsize},Outline=1,Shadow=1'"
-        )
-    else:
-        vf = f"scale='min({max_w},iw)':-2,subtitles='{srt_esc}'"
-
-    cmd = [FFMPEG_BIN, "-y", "-i", str(in_mp4), "-vf", vf, "-c:v", "libx264", "-crf", "20", "-preset", "veryfast", "-c:a", "copy", str(out_mp4)]
+    key = _cache_key(in_mp4, fontsize)
+    cues = _parse_srt(srt)
+    previous = _load_manifest(seg_dir, key) if cues is not None else None
 
+    # Si algo falla a mitad de camino, la caché queda invalidada
+    (seg_dir / "manifest.json").unlink(missing_ok=True)
+    try:
+        _burn_segmented(in_mp4, srt, out_mp4, seg_dir, key, cues, previous, fontsize)
+    except _ProbeError:
+        shutil.rmtree(seg_dir, ignore_errors=True)
+        _single_pass(in_mp4, srt, out_mp4, fontsize)
 
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    if proc.returncode != 0:
-        raise RuntimeError(f"FFmpeg falló:\nSTDOUT:\n{proc.stdout}\nSTDERR:\n{proc.stderr}")